@@ -1,82 +1,86 @@
 import sys
-import re
 import json
 import argparse
-from dataclasses import dataclass, asdict, field
-from typing import List, Optional, Union, Any
+import functools
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Any, Callable, Dict, List, NoReturn, Optional, Tuple, Union
 
 # =============================================================================
 # 1. AST NODES
 # =============================================================================
 
-@dataclass
+# AST nodes are slotted where the interpreter supports it (3.10+): no
+# per-instance __dict__, smaller nodes and faster attribute access.
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_SLOTS)
 class Expr:
     pass
 
-@dataclass
+@dataclass(**_SLOTS)
 class ColumnRef(Expr):
     name: str           # bare "col" or qualified "table.col"
     type: str = "ColumnRef"
 
-@dataclass
+@dataclass(**_SLOTS)
 class Literal(Expr):
     value: Any
     type: str = "Literal"
 
-@dataclass
+@dataclass(**_SLOTS)
 class BinaryOp(Expr):
     left: Expr
     op: str
     right: Expr
     type: str = "BinaryOp"
 
-@dataclass
+@dataclass(**_SLOTS)
 class FuncCall(Expr):
     """Covers both scalar functions (UPPER, LOWER, SPLIT) and aggregates (MAX, MIN, SUM, AVG)."""
     func_name: str
     args: List[Expr]
     type: str = "FuncCall"
 
-@dataclass
+@dataclass(**_SLOTS)
 class OrderByKey:
     col: str            # bare or qualified column name
     ascending: bool = True
 
-@dataclass
+@dataclass(**_SLOTS)
 class JoinClause:
     right_table: str
     right_alias: Optional[str]
     condition: Expr     # typically BinaryOp(ColumnRef, '=', ColumnRef)
     join_type: str = "HASH"
 
-@dataclass
+@dataclass(**_SLOTS)
 class ColumnDef:
     name: str
     data_type: str
 
-@dataclass
+@dataclass(**_SLOTS)
 class Statement:
     pass
 
-@dataclass
+@dataclass(**_SLOTS)
 class CreateTableStmt(Statement):
     table_name: str
     columns: List[ColumnDef]
     type: str = "CREATE_TABLE"
 
-@dataclass
+@dataclass(**_SLOTS)
 class CreateTableAsStmt(Statement):
     table_name: str
     select: 'SelectStmt'
     type: str = "CTAS"
 
-@dataclass
+@dataclass(**_SLOTS)
 class InsertStmt(Statement):
     table_name: str
     values: List[Expr]
     type: str = "INSERT"
 
-@dataclass
+@dataclass(**_SLOTS)
 class SelectStmt(Statement):
     projections: Union[str, List[Expr]]   # '*' or list of Expr
     from_table: str
@@ -88,18 +92,41 @@ class SelectStmt(Statement):
     limit: Optional[int] = None
     type: str = "SELECT"
 
-@dataclass
+@dataclass(**_SLOTS)
 class DeleteStmt(Statement):
     table_name: str
     selection: Optional[Expr] = None
     type: str = "DELETE"
 
-@dataclass
+@dataclass(**_SLOTS)
 class _DropTableStmt(Statement):
     table_name: str
     type: str = "DROP_TABLE"
 
 
+# Field names per AST class, filled on first use by _to_dict (None for
+# non-dataclass leaf types).
+_FIELD_NAMES: Dict[type, Optional[Tuple[str, ...]]] = {}
+
+def _to_dict(node: Any) -> Any:
+    """Convert an AST to plain dicts/lists for JSON output.
+
+    Equivalent to dataclasses.asdict() for this AST, but walks the tree once
+    without deep-copying leaf values.
+    """
+    if isinstance(node, list):
+        return [_to_dict(item) for item in node]
+    cls = type(node)
+    try:
+        names = _FIELD_NAMES[cls]
+    except KeyError:
+        names = tuple(f.name for f in fields(cls)) if is_dataclass(cls) else None
+        _FIELD_NAMES[cls] = names
+    if names is None:
+        return node
+    return {name: _to_dict(getattr(node, name)) for name in names}
+
+
 # =============================================================================
 # 2. LEXER
 # =============================================================================
@@ -110,201 +137,310 @@ _AGG_FUNCS    = {'SUM', 'AVG', 'MIN', 'MAX'}
 _SCALAR_FUNCS = {'UPPER', 'LOWER', 'SPLIT'}
 _FUNC_NAMES   = _AGG_FUNCS | _SCALAR_FUNCS
 
-TOKEN_SPEC = [
-    ('NUMBER',   r'-?\d+(\.\d+)?'),
-    ('STRING',   r"'(?:''|[^'])*'"),
-    ('KEYWORD',  r'\b(SELECT|FROM|WHERE|CREATE|TABLE|INSERT|INTO|VALUES|LIMIT|AND|OR'
-                 r'|INT|BIGINT|FLOAT|TEXT|BOOL|NULL|DROP|SCAN'
-                 r'|ORDER|BY|ASC|DESC|JOIN|HASH|ON|GROUP|DELETE|AS'
-                 r'|SUM|AVG|MIN|MAX|UPPER|LOWER|SPLIT)\b'),
-    ('ID',       r'[a-zA-Z_][a-zA-Z0-9_]*'),
-    ('OP',       r'!=|<=|>=|[=<>*]'),
-    ('DELIM',    r'[(),;.]'),
-    ('SKIP',     r'[ \t\n\r]+'),
-    ('MISMATCH', r'.'),
+# Token kinds.  Interned so the parser can compare them with ``is``.
+_TT_KW, _TT_ID, _TT_NUM, _TT_STR, _TT_OP, _TT_DELIM, _TT_EOF = [
+    sys.intern(s) for s in ('KEYWORD', 'ID', 'NUMBER', 'STRING', 'OP', 'DELIM', 'EOF')
 ]
 
-@dataclass
-class Token:
-    type: str
-    value: str
-    pos: int
+# Identifiers are scanned uniformly and then promoted to KEYWORD by a lookup
+# on their upper-cased spelling.  Maps each keyword to its interned string.
+_KEYWORDS = {kw: sys.intern(kw) for kw in (
+    'SELECT', 'FROM', 'WHERE', 'CREATE', 'TABLE', 'INSERT', 'INTO', 'VALUES',
+    'LIMIT', 'AND', 'OR',
+    'INT', 'BIGINT', 'FLOAT', 'TEXT', 'BOOL', 'NULL', 'DROP', 'SCAN',
+    'ORDER', 'BY', 'ASC', 'DESC', 'JOIN', 'HASH', 'ON', 'GROUP', 'DELETE', 'AS',
+    *_FUNC_NAMES,
+)}
+
+# Character classes for the hand-written scanner.  The lexical grammar is:
+#   NUMBER  -?[0-9]+(.[0-9]+)?
+#   STRING  '...'  with '' as an escaped quote
+#   ID      [a-zA-Z_][a-zA-Z0-9_]*
+#   OP      != <= >= = < > *
+#   DELIM   ( ) , ; .
+# Whitespace (space, tab, CR, LF) is skipped; anything else is an error.
+_DIGITS   = frozenset('0123456789')
+_ID_START = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_')
+_ID_CONT  = _ID_START | _DIGITS
+_SPACE    = frozenset(' \t\n\r')
+_OPS      = frozenset('=<>*')
+_DELIMS   = frozenset('(),;.')
+_TWO_CHAR_OPS = frozenset({'!=', '<=', '>='})
 
 class Lexer:
-    def __init__(self, code):
-        self.tokens = []
-        self.tokenize(code)
+    """Tokenise *code* into three parallel lists: ``types``, ``values`` and
+    ``positions``.  ``tokens`` bundles them as the triple consumed by Parser."""
 
-    def tokenize(self, code):
-        regex = '|'.join('(?P<%s>%s)' % pair for pair in TOKEN_SPEC)
-        for mo in re.finditer(regex, code, re.IGNORECASE):
-            kind  = mo.lastgroup
-            value = mo.group()
-            pos   = mo.start()
-            if kind == 'SKIP':
+    def __init__(self, code: str) -> None:
+        self.types:     List[str] = []
+        self.values:    List[str] = []
+        self.positions: List[int] = []
+        self.tokenize(code)
+        self.tokens = (self.types, self.values, self.positions)
+
+    def tokenize(self, code: str) -> None:
+        # Bound appends hoisted out of the per-token loop.
+        add_type     = self.types.append
+        add_value    = self.values.append
+        add_position = self.positions.append
+        n = len(code)
+        i = 0
+        while i < n:
+            ch    = code[i]
+            start = i
+            if ch in _SPACE:
+                i += 1
                 continue
-            elif kind == 'MISMATCH':
-                raise ValueError(f"Unexpected character '{value}' at position {pos}")
+            if ch in _ID_START:
+                i += 1
+                while i < n and code[i] in _ID_CONT:
+                    i += 1
+                kind    = _TT_ID
+                value   = code[start:i]
+                keyword = _KEYWORDS.get(value.upper())
+                if keyword is not None:
+                    kind  = _TT_KW
+                    value = keyword
+            elif ch in _DIGITS or (ch == '-' and i + 1 < n and code[i + 1] in _DIGITS):
+                i += 1
+                while i < n and code[i] in _DIGITS:
+                    i += 1
+                if i + 1 < n and code[i] == '.' and code[i + 1] in _DIGITS:
+                    i += 2
+                    while i < n and code[i] in _DIGITS:
+                        i += 1
+                kind  = _TT_NUM
+                value = code[start:i]
+            elif ch == "'":
+                # Skip over '' pairs.  If the string never closes, the last
+                # pair's first quote is taken as the terminator instead.
+                end       = code.find("'", i + 1)
+                last_pair = -1
+                while end != -1 and end + 1 < n and code[end + 1] == "'":
+                    last_pair = end
+                    end       = code.find("'", end + 2)
+                if end == -1:
+                    end = last_pair
+                if end == -1:
+                    raise ValueError(f"Unexpected character '{ch}' at position {start}")
+                i     = end + 1
+                kind  = _TT_STR
+                value = code[start:i]
+            elif code[i:i + 2] in _TWO_CHAR_OPS:
+                i    += 2
+                kind  = _TT_OP
+                value = code[start:i]
+            elif ch in _OPS:
+                i    += 1
+                kind  = _TT_OP
+                value = ch
+            elif ch in _DELIMS:
+                i    += 1
+                kind  = _TT_DELIM
+                value = ch
             else:
-                if kind == 'KEYWORD':
-                    value = value.upper()
-                self.tokens.append(Token(kind, value, pos))
-        self.tokens.append(Token('EOF', '', len(code)))
+                raise ValueError(f"Unexpected character '{ch}' at position {start}")
+            add_type(kind)
+            add_value(value)
+            add_position(start)
+        add_type(_TT_EOF)
+        add_value('')
+        add_position(n)
 
 
 # =============================================================================
 # 3. PARSER
 # =============================================================================
 
-_SUPPORTED_TYPES = {'INT', 'BIGINT', 'FLOAT', 'TEXT', 'BOOL'}
+_SUPPORTED_TYPES = frozenset({'INT', 'BIGINT', 'FLOAT', 'TEXT', 'BOOL'})
+
+# Words that end a table reference, so an ID spelled like one of them is not
+# taken as the table's alias.
+_FROM_ALIAS_STOP = frozenset({
+    'WHERE', 'JOIN', 'HASH', 'ON', 'GROUP', 'ORDER', 'LIMIT', 'AND', 'OR',
+    'ASC', 'DESC', 'BY', 'INNER',
+})
+_JOIN_ALIAS_STOP = frozenset({'ON', 'WHERE', 'GROUP', 'ORDER', 'LIMIT'})
+
+# Binary operator precedence for parse_expression (higher binds tighter).
+_CMP_PREC = 3
+_PRECEDENCE = {
+    'OR':  1,
+    'AND': 2,
+    '=': _CMP_PREC, '!=': _CMP_PREC, '<': _CMP_PREC, '<=': _CMP_PREC,
+    '>': _CMP_PREC, '>=': _CMP_PREC,
+}
+
+# Rule ids for the packrat memo table: slot = rule_id * n_tokens + pos.
+_R_EXPR, _R_PRIMARY = 0, 1
+_NUM_MEMO_RULES = 2
+
+_Rule = Callable[['Parser'], Expr]
+
+def _memoize(rule_id: int) -> Callable[[_Rule], _Rule]:
+    """Packrat-cache a parse rule on the token position it starts at.
+
+    The cache stores ``(node, end_pos)`` in ``Parser.memo``; a hit restores
+    ``end_pos`` and returns the same node, which is safe because AST nodes
+    are not mutated after construction.
+    """
+    def decorate(rule: _Rule) -> _Rule:
+        @functools.wraps(rule)
+        def wrapper(self: 'Parser') -> Expr:
+            slot = rule_id * self.n_tokens + self.pos
+            hit  = self.memo[slot]
+            if hit is not None:
+                node, self.pos = hit
+                return node
+            node = rule(self)
+            self.memo[slot] = (node, self.pos)
+            return node
+        return wrapper
+    return decorate
+
 
 class Parser:
-    def __init__(self, tokens, raw_query):
-        self.tokens    = tokens
+    def __init__(self, tokens: Tuple[List[str], List[str], List[int]], raw_query: str) -> None:
+        self.types, self.values, self.positions = tokens
         self.raw_query = raw_query
         self.pos       = 0
-
-    def peek(self):
-        return self.tokens[self.pos]
-
-    def peek2(self):
-        """Look two tokens ahead (for HASH JOIN detection)."""
-        if self.pos + 1 < len(self.tokens):
-            return self.tokens[self.pos + 1]
-        return Token('EOF', '', -1)
-
-    def consume(self, expected_type=None, expected_value=None):
-        token = self.peek()
-        if expected_type and token.type != expected_type:
-            self.error(f"Expected {expected_type}, got {token.type} ({token.value!r})")
-        if expected_value and token.value.upper() != expected_value.upper():
-            self.error(f"Expected '{expected_value}', got '{token.value}'")
-        self.pos += 1
-        return token
-
-    def error(self, message):
-        token        = self.peek()
-        line_preview = self.raw_query[max(0, token.pos - 10): token.pos + 10]
-        full_msg     = (f"Syntax Error at position {token.pos}: {message}\n"
+        self.n_tokens  = len(self.types)
+        self.memo: List[Optional[Tuple[Expr, int]]] = (
+            [None] * (_NUM_MEMO_RULES * self.n_tokens))
+
+    def consume(self, expected_type: Optional[str] = None,
+                expected_value: Optional[str] = None) -> str:
+        """Advance past the current token and return its value."""
+        pos   = self.pos
+        kind  = self.types[pos]
+        value = self.values[pos]
+        if expected_type is not None and kind is not expected_type:
+            self.error(f"Expected {expected_type}, got {kind} ({value!r})")
+        if expected_value is not None and value != expected_value:
+            self.error(f"Expected '{expected_value}', got '{value}'")
+        self.pos = pos + 1
+        return value
+
+    def error(self, message: str) -> NoReturn:
+        pos          = self.positions[self.pos]
+        line_preview = self.raw_query[max(0, pos - 10): pos + 10]
+        full_msg     = (f"Syntax Error at position {pos}: {message}\n"
                         f"Near: ...{line_preview}...")
         print(full_msg, file=sys.stderr)
         sys.exit(1)
 
-    def parse(self):
-        tok = self.peek()
-        if tok.value == 'CREATE': return self.parse_create()
-        if tok.value == 'DROP':   return self.parse_drop()
-        if tok.value == 'INSERT': return self.parse_insert()
-        if tok.value == 'SELECT': return self.parse_select()
-        if tok.value == 'SCAN':   return self.parse_scan()
-        if tok.value == 'DELETE': return self.parse_delete()
-        self.error(f"Unsupported statement start: {tok.value!r}")
+    def parse(self) -> Statement:
+        value = self.values[self.pos]
+        if value == 'CREATE': return self.parse_create()
+        if value == 'DROP':   return self.parse_drop()
+        if value == 'INSERT': return self.parse_insert()
+        if value == 'SELECT': return self.parse_select()
+        if value == 'SCAN':   return self.parse_scan()
+        if value == 'DELETE': return self.parse_delete()
+        self.error(f"Unsupported statement start: {value!r}")
 
     # ------------------------------------------------------------------ DDL
 
-    def parse_create(self):
-        self.consume('KEYWORD', 'CREATE')
-        self.consume('KEYWORD', 'TABLE')
-        table_name = self.consume('ID').value
+    def parse_create(self) -> Statement:
+        self.consume(_TT_KW, 'CREATE')
+        self.consume(_TT_KW, 'TABLE')
+        table_name = self.consume(_TT_ID)
         # CTAS: CREATE TABLE x AS SELECT ...
-        if self.peek().value == 'AS':
-            self.consume('KEYWORD', 'AS')
+        if self.values[self.pos] == 'AS':
+            self.consume(_TT_KW, 'AS')
             select_stmt = self.parse_select()
             return CreateTableAsStmt(table_name=table_name, select=select_stmt)
         # Regular CREATE TABLE
-        self.consume('DELIM', '(')
+        self.consume(_TT_DELIM, '(')
         columns = []
         while True:
-            col_name = self.consume('ID').value
-            col_type = self.consume('KEYWORD').value.upper()
+            col_name = self.consume(_TT_ID)
+            col_type = self.consume(_TT_KW)
             if col_type not in _SUPPORTED_TYPES:
                 self.error(f"Unsupported data type {col_type!r}")
             columns.append(ColumnDef(col_name, col_type))
-            if self.peek().value == ')':
+            if self.values[self.pos] == ')':
                 break
-            self.consume('DELIM', ',')
-        self.consume('DELIM', ')')
+            self.consume(_TT_DELIM, ',')
+        self.consume(_TT_DELIM, ')')
         return CreateTableStmt(table_name=table_name, columns=columns)
 
-    def parse_drop(self):
-        self.consume('KEYWORD', 'DROP')
-        self.consume('KEYWORD', 'TABLE')
-        table_name = self.consume('ID').value
+    def parse_drop(self) -> Statement:
+        self.consume(_TT_KW, 'DROP')
+        self.consume(_TT_KW, 'TABLE')
+        table_name = self.consume(_TT_ID)
         return _DropTableStmt(table_name=table_name)
 
     # ------------------------------------------------------------------ DML
 
-    def parse_insert(self):
-        self.consume('KEYWORD', 'INSERT')
-        self.consume('KEYWORD', 'INTO')
-        table_name = self.consume('ID').value
-        self.consume('KEYWORD', 'VALUES')
-        self.consume('DELIM', '(')
+    def parse_insert(self) -> Statement:
+        self.consume(_TT_KW, 'INSERT')
+        self.consume(_TT_KW, 'INTO')
+        table_name = self.consume(_TT_ID)
+        self.consume(_TT_KW, 'VALUES')
+        self.consume(_TT_DELIM, '(')
         values = []
         while True:
             values.append(self.parse_expression())
-            if self.peek().value == ')':
+            if self.values[self.pos] == ')':
                 break
-            self.consume('DELIM', ',')
-        self.consume('DELIM', ')')
+            self.consume(_TT_DELIM, ',')
+        self.consume(_TT_DELIM, ')')
         return InsertStmt(table_name=table_name, values=values)
 
-    def parse_delete(self):
-        self.consume('KEYWORD', 'DELETE')
-        self.consume('KEYWORD', 'FROM')
-        table_name = self.consume('ID').value
+    def parse_delete(self) -> Statement:
+        self.consume(_TT_KW, 'DELETE')
+        self.consume(_TT_KW, 'FROM')
+        table_name = self.consume(_TT_ID)
         where_clause = None
-        if self.peek().value == 'WHERE':
-            self.consume('KEYWORD', 'WHERE')
+        if self.values[self.pos] == 'WHERE':
+            self.consume(_TT_KW, 'WHERE')
             where_clause = self.parse_expression()
         return DeleteStmt(table_name=table_name, selection=where_clause)
 
-    def parse_select(self):
-        self.consume('KEYWORD', 'SELECT')
+    def parse_select(self) -> SelectStmt:
+        self.consume(_TT_KW, 'SELECT')
 
         # --- projections ---
         projections: Union[str, List[Expr]]
-        if self.peek().value == '*':
-            self.consume('OP', '*')
+        if self.values[self.pos] == '*':
+            self.consume(_TT_OP, '*')
             projections = '*'
         else:
             projections = []
             while True:
                 projections.append(self.parse_projection_expr())
-                if self.peek().value != ',':
+                if self.values[self.pos] != ',':
                     break
-                self.consume('DELIM', ',')
+                self.consume(_TT_DELIM, ',')
             if not projections:
                 self.error("SELECT requires at least one column or '*'")
 
         # --- FROM table [alias] ---
-        self.consume('KEYWORD', 'FROM')
-        table_name = self.consume('ID').value
+        self.consume(_TT_KW, 'FROM')
+        table_name = self.consume(_TT_ID)
         from_alias = None
-        if self.peek().type == 'ID' and self.peek().value.upper() not in {
-            'WHERE', 'JOIN', 'HASH', 'ON', 'GROUP', 'ORDER', 'LIMIT', 'AND', 'OR',
-            'ASC', 'DESC', 'BY', 'INNER'
-        }:
-            from_alias = self.consume('ID').value
+        if (self.types[self.pos] is _TT_ID
+                and self.values[self.pos].upper() not in _FROM_ALIAS_STOP):
+            from_alias = self.consume(_TT_ID)
 
         # --- [HASH] JOIN table [alias] ON cond ---
         join_clause = None
-        if self.peek().value in ('JOIN', 'HASH', 'INNER'):
+        if self.values[self.pos] in ('JOIN', 'HASH', 'INNER'):
             join_type = "HASH"
-            if self.peek().value == 'HASH':
-                self.consume('KEYWORD', 'HASH')
+            if self.values[self.pos] == 'HASH':
+                self.consume(_TT_KW, 'HASH')
                 join_type = "HASH"
-            elif self.peek().value == 'INNER':
-                self.consume('KEYWORD', 'INNER')
+            elif self.values[self.pos] == 'INNER':
+                self.consume(_TT_KW, 'INNER')
                 join_type = "INNER"
-            self.consume('KEYWORD', 'JOIN')
-            right_table = self.consume('ID').value
+            self.consume(_TT_KW, 'JOIN')
+            right_table = self.consume(_TT_ID)
             right_alias = None
-            if self.peek().type == 'ID' and self.peek().value.upper() not in {
-                'ON', 'WHERE', 'GROUP', 'ORDER', 'LIMIT'
-            }:
-                right_alias = self.consume('ID').value
-            self.consume('KEYWORD', 'ON')
+            if (self.types[self.pos] is _TT_ID
+                    and self.values[self.pos].upper() not in _JOIN_ALIAS_STOP):
+                right_alias = self.consume(_TT_ID)
+            self.consume(_TT_KW, 'ON')
             join_cond = self.parse_expression()
             join_clause = JoinClause(
                 right_table=right_table,
@@ -315,46 +451,46 @@ class Parser:
 
         # --- WHERE ---
         where_clause = None
-        if self.peek().value == 'WHERE':
-            self.consume('KEYWORD', 'WHERE')
+        if self.values[self.pos] == 'WHERE':
+            self.consume(_TT_KW, 'WHERE')
             where_clause = self.parse_expression()
 
         # --- GROUP BY col [, col] ---
         group_by = None
-        if self.peek().value == 'GROUP':
-            self.consume('KEYWORD', 'GROUP')
-            self.consume('KEYWORD', 'BY')
+        if self.values[self.pos] == 'GROUP':
+            self.consume(_TT_KW, 'GROUP')
+            self.consume(_TT_KW, 'BY')
             group_by = []
             while True:
                 group_by.append(self._parse_qualified_name())
-                if self.peek().value != ',':
+                if self.values[self.pos] != ',':
                     break
-                self.consume('DELIM', ',')
+                self.consume(_TT_DELIM, ',')
 
         # --- ORDER BY col [ASC|DESC] [, col [ASC|DESC]] ---
         order_by = None
-        if self.peek().value == 'ORDER':
-            self.consume('KEYWORD', 'ORDER')
-            self.consume('KEYWORD', 'BY')
+        if self.values[self.pos] == 'ORDER':
+            self.consume(_TT_KW, 'ORDER')
+            self.consume(_TT_KW, 'BY')
             order_by = []
             while True:
                 col_name = self._parse_qualified_name()
                 ascending = True
-                if self.peek().value == 'DESC':
-                    self.consume('KEYWORD', 'DESC')
+                if self.values[self.pos] == 'DESC':
+                    self.consume(_TT_KW, 'DESC')
                     ascending = False
-                elif self.peek().value == 'ASC':
-                    self.consume('KEYWORD', 'ASC')
+                elif self.values[self.pos] == 'ASC':
+                    self.consume(_TT_KW, 'ASC')
                 order_by.append(OrderByKey(col=col_name, ascending=ascending))
-                if self.peek().value != ',':
+                if self.values[self.pos] != ',':
                     break
-                self.consume('DELIM', ',')
+                self.consume(_TT_DELIM, ',')
 
         # --- LIMIT n ---
         limit_val = None
-        if self.peek().value == 'LIMIT':
-            self.consume('KEYWORD', 'LIMIT')
-            limit_val = int(self.consume('NUMBER').value)
+        if self.values[self.pos] == 'LIMIT':
+            self.consume(_TT_KW, 'LIMIT')
+            limit_val = int(self.consume(_TT_NUM))
 
         return SelectStmt(
             projections=projections,
@@ -367,20 +503,20 @@ class Parser:
             limit=limit_val,
         )
 
-    def parse_scan(self):
+    def parse_scan(self) -> Statement:
         """SCAN <table>  — full table scan shorthand."""
-        self.consume('KEYWORD', 'SCAN')
-        table_name = self.consume('ID').value
+        self.consume(_TT_KW, 'SCAN')
+        table_name = self.consume(_TT_ID)
         return SelectStmt('*', table_name)
 
     # ------------------------------------------------------------------ expressions
 
     def _parse_qualified_name(self) -> str:
         """Parse `name` or `table.col` and return as a string."""
-        name = self.consume('ID').value
-        if self.peek().value == '.' and self.peek().type == 'DELIM':
-            self.consume('DELIM', '.')
-            col = self.consume('ID').value
+        name = self.consume(_TT_ID)
+        if self.values[self.pos] == '.' and self.types[self.pos] is _TT_DELIM:
+            self.consume(_TT_DELIM, '.')
+            col = self.consume(_TT_ID)
             return f"{name}.{col}"
         return name
 
@@ -388,98 +524,112 @@ class Parser:
         """Parse a SELECT-list item: may be a function call, column ref, or literal."""
         return self.parse_expression()
 
-    def parse_expression(self):
-        return self.parse_or()
-
-    def parse_or(self):
-        node = self.parse_and()
-        while self.peek().value == 'OR':
-            op    = self.consume().value
-            right = self.parse_and()
-            node  = BinaryOp(node, op, right)
-        return node
-
-    def parse_and(self):
-        node = self.parse_comparison()
-        while self.peek().value == 'AND':
-            op    = self.consume().value
-            right = self.parse_comparison()
-            node  = BinaryOp(node, op, right)
-        return node
-
-    def parse_comparison(self):
-        node = self.parse_additive()
-        if self.peek().type == 'OP' and self.peek().value != '*':
-            op    = self.consume().value
-            right = self.parse_additive()
-            return BinaryOp(node, op, right)
-        return node
-
-    def parse_additive(self):
+    @_memoize(_R_EXPR)
+    def parse_expression(self) -> Expr:
+        """Parse an OR / AND / comparison expression with an operator stack.
+
+        Operands come from parse_additive().  Each binary operator reduces
+        the stack while the operator on top binds at least as tightly, which
+        keeps AND and OR left-associative.  Comparisons do not chain: a
+        second comparison operator directly after one ends the expression,
+        as ``a = b = c`` stops after ``a = b``.
+        """
+        values   = self.values
+        operands = [self.parse_additive()]
+        ops: List[Tuple[str, int]] = []             # (op, precedence) pairs
+        while True:
+            op   = values[self.pos]
+            prec = _PRECEDENCE.get(op)
+            if prec is None:
+                break
+            if prec == _CMP_PREC and ops and ops[-1][1] == _CMP_PREC:
+                break
+            while ops and ops[-1][1] >= prec:
+                right        = operands.pop()
+                operands[-1] = BinaryOp(operands[-1], ops.pop()[0], right)
+            ops.append((op, prec))
+            self.pos += 1
+            operands.append(self.parse_additive())
+        while ops:
+            right        = operands.pop()
+            operands[-1] = BinaryOp(operands[-1], ops.pop()[0], right)
+        return operands[0]
+
+    def parse_additive(self) -> Expr:
+        types, values = self.types, self.values
         node = self.parse_primary()
-        while self.peek().type == 'OP' and self.peek().value in ('+', '-'):
-            op    = self.consume().value
-            right = self.parse_primary()
-            node  = BinaryOp(node, op, right)
+        while types[self.pos] is _TT_OP and values[self.pos] in ('+', '-'):
+            op        = values[self.pos]
+            self.pos += 1
+            right     = self.parse_primary()
+            node      = BinaryOp(node, op, right)
         return node
 
-    def parse_primary(self):
-        token = self.peek()
+    @_memoize(_R_PRIMARY)
+    def parse_primary(self) -> Expr:
+        # Token kinds already checked here are skipped by advancing self.pos
+        # directly rather than through consume().
+        types, values = self.types, self.values
+        pos   = self.pos
+        kind  = types[pos]
+        value = values[pos]
 
         # Numeric literal
-        if token.type == 'NUMBER':
-            raw = self.consume().value
-            return Literal(float(raw) if '.' in raw else int(raw))
+        if kind is _TT_NUM:
+            self.pos = pos + 1
+            return Literal(float(value) if '.' in value else int(value))
 
         # String literal
-        if token.type == 'STRING':
-            return Literal(self.consume().value.strip("'"))
+        if kind is _TT_STR:
+            self.pos = pos + 1
+            return Literal(value.strip("'"))
 
         # NULL
-        if token.value == 'NULL':
-            self.consume()
+        if value == 'NULL':
+            self.pos = pos + 1
             return Literal(None)
 
         # Function call: KEYWORD that is a function name followed by '('
-        if token.type == 'KEYWORD' and token.value in _FUNC_NAMES:
-            func_name = self.consume().value
-            self.consume('DELIM', '(')
+        if kind is _TT_KW and value in _FUNC_NAMES:
+            self.pos = pos + 1
+            self.consume(_TT_DELIM, '(')
             args = []
-            while self.peek().value != ')':
+            while values[self.pos] != ')':
                 args.append(self.parse_expression())
-                if self.peek().value == ',':
-                    self.consume('DELIM', ',')
-            self.consume('DELIM', ')')
-            return FuncCall(func_name=func_name, args=args)
+                if values[self.pos] == ',':
+                    self.pos += 1
+            self.consume(_TT_DELIM, ')')
+            return FuncCall(func_name=value, args=args)
 
         # Identifier — may be bare name, qualified name, or function call (user-defined IDs)
-        if token.type == 'ID':
-            name = self.consume().value
+        if kind is _TT_ID:
+            pos += 1
             # function call using an ID token (e.g. custom func)
-            if self.peek().value == '(' and self.peek().type == 'DELIM':
-                self.consume('DELIM', '(')
+            if values[pos] == '(' and types[pos] is _TT_DELIM:
+                self.pos = pos + 1
                 args = []
-                while self.peek().value != ')':
+                while values[self.pos] != ')':
                     args.append(self.parse_expression())
-                    if self.peek().value == ',':
-                        self.consume('DELIM', ',')
-                self.consume('DELIM', ')')
-                return FuncCall(func_name=name.upper(), args=args)
+                    if values[self.pos] == ',':
+                        self.pos += 1
+                self.consume(_TT_DELIM, ')')
+                return FuncCall(func_name=value.upper(), args=args)
             # qualified name: table.col
-            if self.peek().value == '.' and self.peek().type == 'DELIM':
-                self.consume('DELIM', '.')
-                col = self.consume('ID').value
-                return ColumnRef(f"{name}.{col}")
-            return ColumnRef(name)
+            if values[pos] == '.' and types[pos] is _TT_DELIM:
+                self.pos = pos + 1
+                col = self.consume(_TT_ID)
+                return ColumnRef(f"{value}.{col}")
+            self.pos = pos
+            return ColumnRef(value)
 
         # Parenthesised expression
-        if token.value == '(':
-            self.consume('DELIM', '(')
+        if value == '(':
+            self.pos = pos + 1
             expr = self.parse_expression()
-            self.consume('DELIM', ')')
+            self.consume(_TT_DELIM, ')')
             return expr
 
-        self.error(f"Unexpected token in expression: {token.value!r}")
+        self.error(f"Unexpected token in expression: {value!r}")
 
 
 # =============================================================================
@@ -512,7 +662,10 @@ def execute(stmt, engine, out=None) -> None:
 # 5. CLI
 # =============================================================================
 
-def main():
+# Shared encoder for --debug-ast; same output as json.dumps(..., indent=2).
+_PRETTY_ENCODER = json.JSONEncoder(indent=2)
+
+def main() -> None:
     # When running as __main__, register this module under its real name so
     # that engine.py's `import db_cli` resolves to the same module object.
     # Without this, isinstance checks in engine.py fail against __main__ classes.
@@ -538,7 +691,7 @@ def main():
         ast        = sql_parser.parse()
 
         if args.debug_ast:
-            print(json.dumps(asdict(ast), indent=2))
+            print(_PRETTY_ENCODER.encode(_to_dict(ast)))
             sys.exit(0)
 
         if args.execute:
@@ -0,0 +1,24 @@
+"""Build script for Flat-DB.
+
+The modules run as plain Python and need no build step.  Setting
+FLATDB_MYPYC=1 additionally compiles the SQL front end (db_cli.py) with
+mypyc; the .py source stays importable whenever the extension is absent.
+
+    FLATDB_MYPYC=1 python setup.py build_ext --inplace
+"""
+import os
+
+from setuptools import setup
+
+ext_modules = []
+if os.environ.get('FLATDB_MYPYC') == '1':
+    from mypyc.build import mypycify
+    # engine.py is imported lazily from db_cli and is not compiled; only
+    # db_cli.py itself needs to type-check.
+    ext_modules = mypycify(['--follow-imports=silent', 'db_cli.py'])
+
+setup(
+    name='flat-db',
+    py_modules=['db_cli', 'engine', 'storage'],
+    ext_modules=ext_modules,
+)
@@ -0,0 +1,321 @@
+"""
+test_db_cli.py — pytest test suite for the Flat-DB SQL front end.
+
+Run:
+    pytest test_db_cli.py -v
+
+Test groups
+-----------
+TestLexer              – token kinds/values, string escapes, numbers, errors
+TestKeywordPromotion   – identifiers promoted to keywords by spelling
+TestAstToDict          – _to_dict matches dataclasses.asdict
+TestDebugAstCli        – --debug-ast output matches json.dumps(asdict(...))
+TestExpressionShape    – precedence, associativity, parens, non-chaining =
+TestPackratMemo        – per-rule memo slots: cached node and end position
+"""
+
+import dataclasses
+import json
+import sys
+
+import pytest
+
+from db_cli import (
+    Lexer, Parser, BinaryOp, ColumnRef, Literal,
+    _to_dict, main, _R_EXPR, _R_PRIMARY,
+)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def lex(sql):
+    """Return the (kind, value) pairs for *sql*, EOF excluded."""
+    lexer = Lexer(sql)
+    return list(zip(lexer.types, lexer.values))[:-1]
+
+
+def parse(sql):
+    """Lex and parse *sql*, returning the statement AST."""
+    return Parser(Lexer(sql).tokens, sql).parse()
+
+
+def parse_expr(sql):
+    """Parse *sql* as a bare expression; return (node, parser)."""
+    parser = Parser(Lexer(sql).tokens, sql)
+    return parser.parse_expression(), parser
+
+
+def op(left, name, right):
+    """BinaryOp over bare column names, for compact expected trees."""
+    def wrap(x):
+        return ColumnRef(x) if isinstance(x, str) else x
+    return BinaryOp(wrap(left), name, wrap(right))
+
+
+# ===========================================================================
+# 1. Lexer
+# ===========================================================================
+
+class TestLexer:
+
+    def test_eof_sentinel(self):
+        lexer = Lexer("a ")
+        assert lexer.types[-1] == 'EOF'
+        assert lexer.values[-1] == ''
+        assert lexer.positions[-1] == 2
+
+    def test_positions(self):
+        assert Lexer("SELECT  a\n,b").positions == [0, 8, 10, 11, 12]
+
+    def test_mixed_case_keywords_are_uppercased(self):
+        assert lex("SeLeCt x FrOm T") == [
+            ('KEYWORD', 'SELECT'), ('ID', 'x'), ('KEYWORD', 'FROM'), ('ID', 'T'),
+        ]
+
+    def test_keyword_prefix_stays_identifier(self):
+        assert lex("select_x orders") == [('ID', 'select_x'), ('ID', 'orders')]
+
+    def test_string_with_doubled_quote(self):
+        assert lex("'it''s'") == [('STRING', "'it''s'")]
+
+    def test_string_spanning_whitespace(self):
+        assert lex("'a b\nc'") == [('STRING', "'a b\nc'")]
+
+    def test_unterminated_string_raises(self):
+        with pytest.raises(ValueError, match="position 4"):
+            lex("a = 'oops")
+
+    def test_unterminated_after_doubled_quote(self):
+        # The last '' pair's first quote closes the string; the second is stray.
+        with pytest.raises(ValueError, match="position 3"):
+            lex("'a''")
+
+    def test_negative_and_decimal_numbers(self):
+        assert lex("-3 2.5 -0.25") == [
+            ('NUMBER', '-3'), ('NUMBER', '2.5'), ('NUMBER', '-0.25'),
+        ]
+
+    def test_number_dot_identifier(self):
+        assert lex("1.x") == [('NUMBER', '1'), ('DELIM', '.'), ('ID', 'x')]
+
+    def test_qualified_name(self):
+        assert lex("t.col") == [('ID', 't'), ('DELIM', '.'), ('ID', 'col')]
+
+    def test_two_char_operators(self):
+        assert lex("a!=b<=c>=d") == [
+            ('ID', 'a'), ('OP', '!='), ('ID', 'b'), ('OP', '<='),
+            ('ID', 'c'), ('OP', '>='), ('ID', 'd'),
+        ]
+
+    def test_single_char_operators_and_delims(self):
+        assert lex("=<>*(),;.") == [
+            ('OP', '='), ('OP', '<'), ('OP', '>'), ('OP', '*'),
+            ('DELIM', '('), ('DELIM', ')'), ('DELIM', ','), ('DELIM', ';'),
+            ('DELIM', '.'),
+        ]
+
+    def test_lone_minus_raises(self):
+        with pytest.raises(ValueError, match="'-' at position 2"):
+            lex("a - b")
+
+    def test_lone_bang_raises(self):
+        with pytest.raises(ValueError, match="'!' at position 1"):
+            lex("a!b")
+
+    def test_unknown_character_raises(self):
+        with pytest.raises(ValueError, match="'@' at position 28"):
+            lex("SELECT a FROM t WHERE a = 1 @")
+
+    def test_non_ascii_inside_string_is_kept(self):
+        assert lex("'é'") == [('STRING', "'é'")]
+
+    # The scanner is ASCII-only.  The old regex lexer also accepted Unicode
+    # digits (via \d) and the letters that case-fold onto ASCII under
+    # re.IGNORECASE (ſ, K, İ, ı); those are now rejected.
+
+    def test_non_ascii_digits_rejected(self):
+        with pytest.raises(ValueError, match="position 22"):
+            lex("SELECT a FROM t LIMIT ١٠")
+
+    @pytest.mark.parametrize('ch', ['ſ', 'K', 'İ', 'ı'])
+    def test_case_folding_letters_rejected(self, ch):
+        with pytest.raises(ValueError, match="position 0"):
+            lex(ch + "elect")
+
+
+# ===========================================================================
+# 2. Keyword promotion
+# ===========================================================================
+
+class TestKeywordPromotion:
+
+    def test_keyword_directly_after_number(self):
+        # The regex lexer required a word boundary before a keyword, so the
+        # 'and' in '1and' used to lex as an ID.
+        assert lex("1and") == [('NUMBER', '1'), ('KEYWORD', 'AND')]
+
+    def test_delete_predicate_continues_after_glued_keyword(self):
+        # Previously the predicate stopped at 'x = 1' and 'and y = 2' was
+        # silently dropped, widening the set of deleted rows.
+        ast = parse("DELETE FROM t WHERE x = 1and y = 2")
+        assert ast.selection == BinaryOp(
+            BinaryOp(ColumnRef('x'), '=', Literal(1)),
+            'AND',
+            BinaryOp(ColumnRef('y'), '=', Literal(2)),
+        )
+
+    def test_function_names_are_keywords(self):
+        assert lex("sum Upper") == [('KEYWORD', 'SUM'), ('KEYWORD', 'UPPER')]
+
+    def test_inner_is_not_a_keyword(self):
+        assert lex("inner") == [('ID', 'inner')]
+
+
+# ===========================================================================
+# 3. AST -> dict (--debug-ast)
+# ===========================================================================
+
+class TestAstToDict:
+
+    @pytest.mark.parametrize('sql', [
+        "SELECT u.id, SUM(o.amt), upper(name) FROM users u "
+        "HASH JOIN orders o ON u.id = o.uid WHERE o.note = NULL "
+        "GROUP BY u.id, name ORDER BY u.id DESC, name LIMIT 5",
+        "CREATE TABLE x AS SELECT a, b FROM y WHERE a > 1 AND b != 'z'",
+        "CREATE TABLE t (id INT, name TEXT)",
+        "INSERT INTO t VALUES (1, -2.5, 'x', NULL)",
+        "SELECT * FROM t",
+        "DROP TABLE t",
+    ])
+    def test_matches_asdict(self, sql):
+        ast = parse(sql)
+        assert _to_dict(ast) == dataclasses.asdict(ast)
+
+
+class TestDebugAstCli:
+
+    @pytest.mark.parametrize('sql', [
+        "SELECT 'é', name FROM t WHERE name = '日本' OR id >= 2",
+        "INSERT INTO t VALUES (1, 'ü', NULL)",
+    ])
+    def test_output_matches_json_dumps(self, sql, monkeypatch, capsys):
+        monkeypatch.setattr(sys, 'argv', ['db_cli.py', '--debug-ast', '--query', sql])
+        with pytest.raises(SystemExit) as exc:
+            main()
+        assert exc.value.code == 0
+        expected = json.dumps(dataclasses.asdict(parse(sql)), indent=2) + '\n'
+        assert capsys.readouterr().out == expected
+
+
+# ===========================================================================
+# 4. Expression parsing
+# ===========================================================================
+
+class TestExpressionShape:
+
+    def where(self, predicate):
+        return parse("SELECT x FROM t WHERE " + predicate).selection
+
+    def test_and_binds_tighter_than_or(self):
+        assert self.where("a OR b AND c") == op('a', 'OR', op('b', 'AND', 'c'))
+        assert self.where("a AND b OR c") == op(op('a', 'AND', 'b'), 'OR', 'c')
+
+    def test_and_is_left_associative(self):
+        assert self.where("a AND b AND c") == op(op('a', 'AND', 'b'), 'AND', 'c')
+
+    def test_or_is_left_associative(self):
+        assert self.where("a OR b OR c") == op(op('a', 'OR', 'b'), 'OR', 'c')
+
+    def test_comparison_binds_tighter_than_and(self):
+        assert self.where("a = 1 AND b != c") == op(
+            op('a', '=', Literal(1)), 'AND', op('b', '!=', 'c'))
+
+    def test_mixed_chain(self):
+        assert self.where("a < 1 OR b AND c >= 2 OR d") == op(
+            op(op('a', '<', Literal(1)), 'OR', op('b', 'AND', op('c', '>=', Literal(2)))),
+            'OR', 'd')
+
+    def test_parentheses_override_precedence(self):
+        assert self.where("(a OR b) AND c") == op(op('a', 'OR', 'b'), 'AND', 'c')
+        assert self.where("a AND (b OR c)") == op('a', 'AND', op('b', 'OR', 'c'))
+
+    def test_nested_parentheses(self):
+        assert self.where("((a = 1))") == op('a', '=', Literal(1))
+
+    def test_comparisons_do_not_chain(self):
+        node, parser = parse_expr("a = b = c")
+        assert node == op('a', '=', 'b')
+        assert parser.values[parser.pos] == '='
+        assert parser.pos == 3
+
+    def test_second_comparison_ends_and_operand(self):
+        node, parser = parse_expr("x AND a = b = c")
+        assert node == op('x', 'AND', op('a', '=', 'b'))
+        assert parser.pos == 5
+
+    def test_star_is_not_a_binary_operator(self):
+        node, parser = parse_expr("a * b")
+        assert node == ColumnRef('a')
+        assert parser.values[parser.pos] == '*'
+
+    def test_select_star_projection(self):
+        assert parse("SELECT * FROM t WHERE a = 1").projections == '*'
+
+
+class TestPackratMemo:
+
+    SQL = "a = 1 AND (b OR c)"      # tokens: a = 1 AND ( b OR c ) EOF
+
+    def test_expression_hit_returns_same_node_and_end_pos(self):
+        parser = Parser(Lexer(self.SQL).tokens, self.SQL)
+        first = parser.parse_expression()
+        end = parser.pos
+        assert end == 9
+        parser.pos = 0
+        assert parser.parse_expression() is first
+        assert parser.pos == end
+
+    def test_primary_hit_returns_same_node_and_end_pos(self):
+        parser = Parser(Lexer(self.SQL).tokens, self.SQL)
+        parser.pos = 4
+        first = parser.parse_primary()          # the parenthesised OR
+        assert first == op('b', 'OR', 'c')
+        assert parser.pos == 9
+        parser.pos = 4
+        assert parser.parse_primary() is first
+        assert parser.pos == 9
+
+    def test_rules_do_not_share_slots(self):
+        parser = Parser(Lexer(self.SQL).tokens, self.SQL)
+        primary = parser.parse_primary()
+        assert (primary, parser.pos) == (ColumnRef('a'), 1)
+        parser.pos = 0
+        expr = parser.parse_expression()
+        assert expr == op(op('a', '=', Literal(1)), 'AND', op('b', 'OR', 'c'))
+        assert parser.pos == 9
+        parser.pos = 0
+        assert parser.parse_primary() is primary
+        assert parser.pos == 1
+
+    def test_slot_layout(self):
+        parser = Parser(Lexer(self.SQL).tokens, self.SQL)
+        n = parser.n_tokens
+        assert len(parser.memo) == 2 * n
+        expr = parser.parse_expression()
+        assert parser.memo[_R_EXPR * n + 0] == (expr, 9)
+        assert parser.memo[_R_PRIMARY * n + 0] == (ColumnRef('a'), 1)
+        assert parser.memo[_R_PRIMARY * n + 2] == (Literal(1), 3)
+
+    @pytest.mark.parametrize('rule_id, method', [
+        (_R_EXPR, 'parse_expression'),
+        (_R_PRIMARY, 'parse_primary'),
+    ])
+    def test_lookup_reads_rule_slot(self, rule_id, method):
+        parser = Parser(Lexer(self.SQL).tokens, self.SQL)
+        planted = Literal('planted')
+        parser.memo[rule_id * parser.n_tokens + 5] = (planted, 7)
+        parser.pos = 5
+        assert getattr(parser, method)() is planted
+        assert parser.pos == 7